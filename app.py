@@ -1,31 +1,39 @@
 import streamlit as st
+import os
 import pickle
-import networkx as nx
+import numpy as np
 import folium
 from streamlit_folium import folium_static
-from geopy.distance import great_circle
 import pandas as pd
+from shapely.geometry import LineString
+from scipy.spatial import cKDTree
+from scipy.sparse import csr_matrix
+from convert_networks import EDGE_FIELDS, NODE_FIELDS, graph_to_arrays
+from routing import yen_k_shortest_paths
 
 # --- CO₂ calculation helper ---
 def calculate_co2(length_meters, emission_rate_g_per_km=150):
     return (length_meters / 1000) * emission_rate_g_per_km
 
-# --- Estimate ventilation penalty if missing ---
-def estimate_ventilation(edge):
-    highway = edge.get('highway', '')
-    if isinstance(highway, list):
-        highway = highway[0]
-    if highway in ['motorway', 'tunnel']:
-        return 3  # low ventilation
-    elif highway in ['primary', 'secondary']:
-        return 2  # moderate
-    else:
-        return 1  # good ventilation
-
-
-# --- Load network data ---
-with open("vienna_networks.pkl", "rb") as f:
-    vienna_network = pickle.load(f)
+# --- Load network data (once per server process, shared across reruns) ---
+@st.cache_resource
+def load_networks(path="vienna_networks.pkl"):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+# A .npz older than the pickle is stale (e.g. after re-running reconstruct_file.py)
+def arrays_are_current(path, pickle_path):
+    if not os.path.exists(path):
+        return False
+    return not os.path.exists(pickle_path) or os.path.getmtime(path) >= os.path.getmtime(pickle_path)
+
+# Prefer the flat arrays written by convert_networks.py; otherwise flatten the pickled graph
+@st.cache_resource
+def network_arrays(network_key, path="vienna_networks.npz", pickle_path="vienna_networks.pkl"):
+    if arrays_are_current(path, pickle_path):
+        with np.load(path) as data:
+            return {field: data[f"{network_key}.{field}"] for field in NODE_FIELDS + EDGE_FIELDS}
+    return graph_to_arrays(load_networks(pickle_path)[network_key])
 
 # --- Streamlit UI ---
 st.set_page_config(page_title="Alofi Sustainability Navigation", layout="wide")
@@ -49,102 +57,150 @@ network_options = {
     "Multi-Modal Network": "G_multi"
 }
 selected_network_name = st.selectbox("Choose Network Type", list(network_options.keys()))
-G = vienna_network[network_options[selected_network_name]]
+network_key = network_options[selected_network_name]
+
+# --- Node and edge attribute tables (built once per network) ---
+# Keyed on the network name rather than the graph so each network gets its own tables.
+@st.cache_resource
+def node_table(network_key):
+    arrays = network_arrays(network_key)
+    ids = arrays["ids"]
+    node_idx = {n: i for i, n in enumerate(ids.tolist())}
+    xy = np.column_stack((arrays["y"], arrays["x"]))
+    return ids, node_idx, xy
+
+@st.cache_resource
+def edge_table(network_key):
+    arrays = network_arrays(network_key)
+    ids = arrays["ids"]
+    pairs = zip(ids[arrays["u"]].tolist(), ids[arrays["v"]].tolist())
+    edge_idx = {pair: i for i, pair in enumerate(pairs)}
+    return edge_idx, arrays["length"], arrays["travel_time"], arrays["ventilation"]
+
+# Equirectangular projection around the network's mean latitude: plain squared distances
+# then rank nodes the same way great-circle distance does at city scale, with no per-node trig
+@st.cache_resource
+def precompute_node_arrays(network_key):
+    ids, _, xy = node_table(network_key)
+    lats, lons = np.radians(xy[:, 0]), np.radians(xy[:, 1])
+    coslat = np.cos(lats.mean()) if len(ids) else 1.0
+    return ids, np.column_stack((lats, lons * coslat)), coslat
+
+@st.cache_resource
+def node_index(network_key):
+    _, planar, _ = precompute_node_arrays(network_key)
+    return cKDTree(planar)
 
 # --- Nearest node finder ---
 def find_nearest_node(coord):
-    nearest_node = None
-    min_dist = float("inf")
-    for node_id, data in G.nodes(data=True):
-        node_coord = (data["y"], data["x"])
-        dist = great_circle(coord, node_coord).meters
-        if dist < min_dist:
-            min_dist = dist
-            nearest_node = node_id
-    return nearest_node
-
-# --- Route generator ---
-def get_diverse_routes(start_node, end_node, graph, num_routes=5, penalty_factor=2.0):
-    routes = []
-    G_temp = graph.copy()
-
-    for i in range(num_routes):
-        try:
-            route = nx.shortest_path(
-                G_temp, source=start_node, target=end_node, weight='travel_time'
-            )
-            routes.append(route)
-            for u, v in zip(route[:-1], route[1:]):
-                if G_temp.has_edge(u, v):
-                    G_temp[u][v]['travel_time'] *= penalty_factor
-        except nx.NetworkXNoPath:
-            st.warning(f"No path found for route {i+1}")
-            break
+    ids, _, coslat = precompute_node_arrays(network_key)
+    if len(ids) == 0:
+        return None
+    lat0, lon0 = np.radians(coord)
+    point = np.array([lat0, lon0 * coslat])
+    _, i = node_index(network_key).query(point, k=1)
+    return int(ids[i])
+
+# --- Sparse routing matrix (built once per network) ---
+@st.cache_resource
+def routing_matrix(network_key):
+    arrays = network_arrays(network_key)
+    times = arrays["travel_time"]
+    # Edges without a travel_time (e.g. G_multi) cost 1, like NetworkX's default weight.
+    # Built as float64: csgraph converts any other dtype to float64 on every dijkstra call.
+    weights = np.where(times > 0, times.astype(np.float64), 1.0)
+    n = len(arrays["ids"])
+    matrix = csr_matrix((weights, (arrays["u"], arrays["v"])), shape=(n, n))
+    matrix.sort_indices()
+    return matrix
+
+# --- Route generator (Yen's k shortest loopless paths) ---
+# Results are cached per (network, snapped start/end node), so repeated queries skip the search
+@st.cache_data(max_entries=256)
+def get_diverse_routes(start_node, end_node, network_key, num_routes=5):
+    ids, node_idx, _ = node_table(network_key)
+    paths = yen_k_shortest_paths(routing_matrix(network_key), node_idx[start_node], node_idx[end_node], num_routes)
+    routes = [ids[path].tolist() for path in paths]
+
+    if routes and len(routes) < num_routes:
+        st.warning(f"Only {len(routes)} distinct routes exist between these points")
 
     return routes
 
+# --- Polyline simplification (display only; summaries keep full resolution) ---
+# 5 decimals is ~1 m, finer than a pixel at street zoom; shorter numbers keep the map JSON compact
+COORD_DECIMALS = 5
+
+def simplify_coords(coords, zoom):
+    if len(coords) < 3:
+        return coords
+    # Douglas–Peucker with a tolerance of roughly one screen pixel at this zoom level
+    tolerance = 360 / (256 * 2 ** zoom)
+    return list(LineString(coords).simplify(tolerance, preserve_topology=False).coords)
+
 # --- Create Map with Routes ---
-def create_map(routes, start_coord, end_coord):
-    m = folium.Map(location=start_coord, zoom_start=14)
+def create_map(network_name, routes, start_coord, end_coord, zoom_start=14):
+    m = folium.Map(location=start_coord, zoom_start=zoom_start)
     colors = ["blue", "green", "red", "purple", "orange"]
 
+    _, node_idx, xy = node_table(network_options[network_name])
+
     for i, route in enumerate(routes):
-        route_coords = [(G.nodes[n]["y"], G.nodes[n]["x"]) for n in route]
+        route_xy = np.round(xy[[node_idx[n] for n in route]], COORD_DECIMALS)
+        route_coords = simplify_coords(route_xy.tolist(), zoom_start)
         folium.PolyLine(
             locations=route_coords,
             color=colors[i % len(colors)],
             weight=5,
             opacity=0.8,
-            tooltip=f"{selected_network_name} Route {i+1}"
+            tooltip=f"{network_name} Route {i+1}"
         ).add_to(m)
 
     folium.Marker(location=start_coord, popup="Start", icon=folium.Icon(color="green")).add_to(m)
     folium.Marker(location=end_coord, popup="End", icon=folium.Icon(color="red")).add_to(m)
     return m
 
+# Identical (network, routes, endpoints) reruns reuse the rendered HTML instead of rebuilding the map
+@st.cache_data(max_entries=256)
+def render_map_html(network_name, routes, start_coord, end_coord):
+    return create_map(network_name, routes, start_coord, end_coord).get_root().render()
+
 # --- Route Summary Table (with sustainability placeholders + CO₂ auto) ---
-def summarize_routes(routes):
+# Cached per (network, routes) like the map HTML, so repeated queries skip the reductions
+@st.cache_data(max_entries=256)
+def summarize_routes(network_key, routes):
     summary = []
+    edge_idx, lengths, times, ventilations = edge_table(network_key)
     for i, route in enumerate(routes):
-        total_length = 0
-        total_time = 0
-        total_co2 = 0
-        total_ventilation = 0
-        total_score = 0
-
-        for u, v in zip(route[:-1], route[1:]):
-            edge = G.get_edge_data(u, v)
-            if edge:
-                length = edge.get('length', 0)
-                travel_time = edge.get('travel_time', 0)
-
-                # CO₂ auto calculation
-                calculated_co2 = calculate_co2(length)
-
-                total_length += length
-                total_time += travel_time
-                total_co2 += calculated_co2
-                ventilation = edge.get('ventilation_penalty', estimate_ventilation(edge))
-                total_ventilation += ventilation
-                vent_count = len(route) - 1
-                # Compute sustainability score per edge and add it
-                score = 100 - (0.05 * calculated_co2) - (10 * ventilation)
-                score = max(0, min(100, score))  # Clamp between 0–100
-                total_score += score
-
+        pairs = zip(route[:-1], route[1:])
+        idx = np.fromiter((edge_idx[p] for p in pairs if p in edge_idx), dtype=np.int64)
+        # Stored columns are float32/uint8; reduce in float64 so the table shows clean values
+        route_lengths = lengths[idx].astype(float)
+        route_times = times[idx].astype(float)
+        route_ventilation = ventilations[idx].astype(float)
+
+        # CO₂ auto calculation
+        route_co2 = calculate_co2(route_lengths)
+        # Sustainability score per edge, clamped between 0–100
+        scores = np.clip(100 - (0.05 * route_co2) - (10 * route_ventilation), 0, 100)
+        vent_count = max(len(route) - 1, 1)
 
         summary.append({
             "Route": f"Route {i+1}",
             "Nodes": len(route),
-            "Distance (m)": round(total_length, 1),
-            "Travel Time (min)": round(total_time / 60, 1),
-            "CO₂ Emissions (g)": round(total_co2, 2),
-            "Ventilation Penalty": round(total_ventilation / vent_count, 2),
-            "Sustainability Score": round(total_score, 2)
+            "Distance (m)": round(route_lengths.sum(), 1),
+            "Travel Time (min)": round(route_times.sum() / 60, 1),
+            "CO₂ Emissions (g)": round(route_co2.sum(), 2),
+            "Ventilation Penalty": round(route_ventilation.sum() / vent_count, 2),
+            "Sustainability Score": round(scores.sum(), 2)
         })
 
     return pd.DataFrame(summary)
 
+@st.cache_data(max_entries=256)
+def summary_csv(route_table):
+    return route_table.to_csv(index=False).encode('utf-8')
+
 # --- Input Coordinates ---
 st.markdown("### 🖱 Click on the map or enter coordinates manually")
 
@@ -180,8 +236,12 @@ else:
         end_lon = st.text_input("End Longitude", value="16.37081")
 
 
-# --- Generate Button ---
-if st.button("Generate Routes"):
+# --- Generate Button (a fragment, so clicking it reruns only this panel) ---
+@st.fragment
+def routes_panel(start_lat, start_lon, end_lat, end_lon):
+    if not st.button("Generate Routes"):
+        return
+
     try:
         start_coord = (float(start_lat), float(start_lon))
         end_coord = (float(end_lat), float(end_lon))
@@ -194,25 +254,25 @@ if st.button("Generate Routes"):
             st.error("Could not find nearby nodes. Try different coordinates.")
         else:
             st.success(f"Start Node: {start_node}, End Node: {end_node}")
-            routes = get_diverse_routes(start_node, end_node, G)
+            routes = get_diverse_routes(start_node, end_node, network_key)
 
             if not routes:
                 st.warning("No routes found. Try closer coordinates.")
             else:
-                route_map = create_map(routes, start_coord, end_coord)
-                route_table = summarize_routes(routes)
+                routes = tuple(tuple(r) for r in routes)
+                route_html = render_map_html(selected_network_name, routes, start_coord, end_coord)
+                route_table = summarize_routes(network_key, routes)
 
                 # Display in Tabs
                 tab1, tab2 = st.tabs(["🗺️ Route Map", "📊 Route Summary"])
                 with tab1:
-                    folium_static(route_map, width=None, height=700)
+                    st.iframe(route_html, height=700)
                 with tab2:
-                    st.dataframe(route_table, use_container_width=True)
+                    st.dataframe(route_table, width="stretch")
                 # --- Download Button ---
-                csv = route_table.to_csv(index=False).encode('utf-8')
                 st.download_button(
                     label="📥 Download Route Summary as CSV",
-                    data=csv,
+                    data=summary_csv(route_table),
                     file_name='route_summary.csv',
                     mime='text/csv'
                 )
@@ -220,3 +280,5 @@ if st.button("Generate Routes"):
 
     except Exception as e:
         st.error(f"Error: {e}")
+
+routes_panel(start_lat, start_lon, end_lat, end_lon)
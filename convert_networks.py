@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Script to convert the pickled NetworkX graphs into compact NumPy arrays.
+Writes vienna_networks.npz, which app.py loads instead of vienna_networks.pkl.
+"""
+
+import os
+import pickle
+import numpy as np
+
+NODE_FIELDS = ("ids", "y", "x")
+EDGE_FIELDS = ("u", "v", "length", "travel_time", "ventilation")
+
+# Ventilation penalty by highway type: 3 = low ventilation, 2 = moderate, anything else 1 = good
+VENTILATION_LUT = {'motorway': 3, 'tunnel': 3, 'primary': 2, 'secondary': 2}
+
+def estimate_ventilation(edge):
+    """Estimate the ventilation penalty of an edge from its highway type."""
+    highway = edge.get('highway', '')
+    if isinstance(highway, list):
+        highway = highway[0]
+    return VENTILATION_LUT.get(highway, 1)
+
+def graph_to_arrays(graph):
+    """
+    Flatten a graph into parallel node and edge arrays.
+
+    Edges reference nodes by row (u, v index into ids). Parallel edges in
+    multigraphs are collapsed to the fastest one.
+
+    Args:
+        graph (networkx.DiGraph): Road network with y/x node coordinates
+
+    Returns:
+        dict: Arrays keyed by NODE_FIELDS and EDGE_FIELDS
+    """
+    ids = np.fromiter(graph.nodes, dtype=np.int64, count=graph.number_of_nodes())
+    node_idx = {n: i for i, n in enumerate(ids.tolist())}
+    y = np.fromiter((d["y"] for _, d in graph.nodes(data=True)), dtype=float, count=len(ids))
+    x = np.fromiter((d["x"] for _, d in graph.nodes(data=True)), dtype=float, count=len(ids))
+
+    edge_idx = {}
+    rows = []
+    for u, v, d in graph.edges(data=True):
+        ventilation = d.get('ventilation_penalty')
+        if ventilation is None:
+            ventilation = estimate_ventilation(d)
+        row = [node_idx[u], node_idx[v], d.get('length', 0), d.get('travel_time', 0), ventilation]
+        e = edge_idx.get((u, v))
+        if e is None:
+            edge_idx[(u, v)] = len(rows)
+            rows.append(row)
+        elif row[3] < rows[e][3]:
+            # Parallel edges (multigraph networks): keep the fastest one
+            rows[e] = row
+
+    columns = list(zip(*rows)) if rows else [()] * len(EDGE_FIELDS)
+    return {
+        "ids": ids,
+        "y": y,
+        "x": x,
+        "u": np.array(columns[0], dtype=np.int32),
+        "v": np.array(columns[1], dtype=np.int32),
+        # float32 is ample for metres/seconds per edge and halves the file and table size;
+        # routing_matrix in app.py widens travel_time to float64 for scipy's csgraph
+        "length": np.array(columns[2], dtype=np.float32),
+        "travel_time": np.array(columns[3], dtype=np.float32),
+        "ventilation": np.array(columns[4], dtype=np.uint8),
+    }
+
+def convert_networks(input_file, output_file):
+    """
+    Convert every graph in the pickled network dict to arrays in one .npz file.
+
+    Args:
+        input_file (str): Path to vienna_networks.pkl
+        output_file (str): Path for the .npz file
+    """
+    with open(input_file, 'rb') as f:
+        networks = pickle.load(f)
+
+    arrays = {}
+    for key, graph in networks.items():
+        print(f"Converting {key}: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges")
+        for field, values in graph_to_arrays(graph).items():
+            arrays[f"{key}.{field}"] = values
+
+    # Uncompressed, so members load without a decompression pass
+    np.savez(output_file, **arrays)
+
+    print(f"\nConversion complete!")
+    print(f"Input size: {os.path.getsize(input_file) / (1024*1024):.2f} MB")
+    print(f"Output size: {os.path.getsize(output_file) / (1024*1024):.2f} MB")
+    print(f"Output file: {output_file}")
+
+if __name__ == "__main__":
+    input_file = "vienna_networks.pkl"
+    output_file = "vienna_networks.npz"
+
+    if not os.path.exists(input_file):
+        print(f"Error: Input file not found: {input_file}")
+        print("Run reconstruct_file.py first.")
+        exit(1)
+
+    convert_networks(input_file, output_file)
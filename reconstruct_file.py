@@ -5,16 +5,58 @@ Reassembles vienna_networks.pkl from its chunks.
 """
 
 import os
+import re
+import sys
+import shutil
 import hashlib
 
+BLOCK_SIZE = 1 << 20  # 1 MiB
+
+ORIGINAL_FILE_RE = re.compile(r"^Original file: (.+?)\s*$", re.MULTILINE)
+ORIGINAL_SIZE_RE = re.compile(r"^Original size: (\d+)", re.MULTILINE)
+# Format: "  01. vienna_networks_part_01.chunk (25165824 bytes)"
+CHUNK_LINE_RE = re.compile(r"^\s+\d+\. (.+?\.chunk) \(\d+ bytes\)", re.MULTILINE)
+
 def calculate_file_hash(filepath):
     """Calculate SHA256 hash of a file."""
-    sha256_hash = hashlib.sha256()
     with open(filepath, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
+        if hasattr(hashlib, "file_digest"):  # Python 3.11+
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        sha256_hash = hashlib.sha256()
+        for byte_block in iter(lambda: f.read(BLOCK_SIZE), b""):
             sha256_hash.update(byte_block)
     return sha256_hash.hexdigest()
 
+def parse_manifest(manifest_path):
+    """
+    Parse a manifest written by split_file.py.
+    
+    Returns:
+        tuple: (original_filename, original_size, chunk_files)
+    """
+    with open(manifest_path, 'r') as manifest:
+        text = manifest.read()
+    
+    original_file = ORIGINAL_FILE_RE.search(text)
+    original_size = ORIGINAL_SIZE_RE.search(text)
+    return (
+        original_file.group(1) if original_file else None,
+        int(original_size.group(1)) if original_size else None,
+        CHUNK_LINE_RE.findall(text),
+    )
+
+def copy_chunk(chunk_file, outfile, size):
+    """Append an open chunk file to outfile, in-kernel via sendfile on Linux."""
+    if sys.platform.startswith("linux") and hasattr(os, "sendfile"):
+        remaining = size
+        while remaining > 0:
+            sent = os.sendfile(outfile.fileno(), chunk_file.fileno(), None, remaining)
+            if sent == 0:  # chunk shorter than expected
+                break
+            remaining -= sent
+    else:
+        shutil.copyfileobj(chunk_file, outfile, BLOCK_SIZE)
+
 def reconstruct_file(chunk_dir, output_file=None):
     """
     Reconstruct the original file from chunks.
@@ -33,24 +75,7 @@ def reconstruct_file(chunk_dir, output_file=None):
     manifest_path = os.path.join(chunk_dir, manifest_files[0])
     
     # Parse manifest
-    chunk_files = []
-    original_filename = None
-    original_size = None
-    
-    with open(manifest_path, 'r') as manifest:
-        lines = manifest.readlines()
-        for line in lines:
-            if line.startswith("Original file:"):
-                original_filename = line.split(": ", 1)[1].strip()
-            elif line.startswith("Original size:"):
-                original_size = int(line.split(": ", 1)[1].split()[0])
-            elif line.startswith("  ") and ".chunk" in line:
-                # Extract chunk filename from manifest line
-                # Format: "  01. vienna_networks_part_01.chunk (25165824 bytes)"
-                parts = line.strip().split(". ", 1)
-                if len(parts) > 1:
-                    chunk_filename = parts[1].split(" (")[0]
-                    chunk_files.append(chunk_filename)
+    original_filename, original_size, chunk_files = parse_manifest(manifest_path)
     
     if not chunk_files:
         print("Error: No chunk files found in manifest!")
@@ -80,12 +105,8 @@ def reconstruct_file(chunk_dir, output_file=None):
             print(f"Processing chunk {i}/{len(chunk_files)}: {chunk_filename} ({chunk_size / (1024*1024):.2f} MB)")
             
             with open(chunk_path, 'rb') as chunk_file:
-                while True:
-                    block = chunk_file.read(8192)
-                    if not block:
-                        break
-                    outfile.write(block)
-                    total_bytes_written += len(block)
+                copy_chunk(chunk_file, outfile, chunk_size)
+            total_bytes_written += chunk_size
     
     # Verify reconstruction
     reconstructed_size = os.path.getsize(output_file)
@@ -110,17 +131,7 @@ def verify_chunks_exist(chunk_dir):
         return False, "No manifest file found"
     
     manifest_path = os.path.join(chunk_dir, manifest_files[0])
-    chunk_files = []
-    
-    with open(manifest_path, 'r') as manifest:
-        lines = manifest.readlines()
-        for line in lines:
-            if line.startswith("  ") and ".chunk" in line:
-                # Format: "  01. vienna_networks_part_01.chunk (25165824 bytes)"
-                parts = line.strip().split(". ", 1)
-                if len(parts) > 1:
-                    chunk_filename = parts[1].split(" (")[0]
-                    chunk_files.append(chunk_filename)
+    _, _, chunk_files = parse_manifest(manifest_path)
     
     missing_files = []
     for chunk_file in chunk_files:
@@ -0,0 +1,77 @@
+"""
+Yen's k shortest loopless paths on a scipy CSR matrix.
+Every spur search is a compiled scipy.sparse.csgraph.dijkstra call.
+"""
+
+import heapq
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+
+def edge_position(matrix, u, v):
+    """Index into matrix.data of edge u -> v (rows must have sorted indices)."""
+    start, end = matrix.indptr[u], matrix.indptr[u + 1]
+    return start + np.searchsorted(matrix.indices[start:end], v)
+
+def path_cost(matrix, path):
+    """Sum of the edge weights along a path of matrix rows."""
+    return sum(matrix.data[edge_position(matrix, u, v)] for u, v in zip(path[:-1], path[1:]))
+
+def path_from_predecessors(predecessors, source, target):
+    """Walk a dijkstra predecessor array back from target to source."""
+    path = [target]
+    while path[-1] != source:
+        path.append(int(predecessors[path[-1]]))
+    return path[::-1]
+
+def spur_path(matrix, shortest, j, target):
+    """Shortest path that leaves the latest accepted path at its j-th node, or None."""
+    previous = shortest[-1]
+    spur_node = previous[j]
+    root = previous[:j + 1]
+    # Block the next edge of every accepted path sharing this root, and leaving any root node
+    data = matrix.data.copy()
+    for path in shortest:
+        if path[:j + 1] == root:
+            data[edge_position(matrix, path[j], path[j + 1])] = np.inf
+    for node in root[:-1]:
+        data[matrix.indptr[node]:matrix.indptr[node + 1]] = np.inf
+
+    spur_matrix = csr_matrix((data, matrix.indices, matrix.indptr), shape=matrix.shape)
+    dist, pred = dijkstra(spur_matrix, directed=True, indices=spur_node, return_predecessors=True)
+    if np.isinf(dist[target]):
+        return None
+    return root[:-1] + path_from_predecessors(pred, spur_node, target)
+
+def yen_k_shortest_paths(matrix, source, target, k):
+    """
+    Yen's k shortest loopless paths over a CSR matrix of non-negative weights.
+    
+    Args:
+        matrix (scipy.sparse.csr_matrix): Weighted adjacency with sorted indices
+        source (int): Row of the start node
+        target (int): Row of the end node
+        k (int): Maximum number of paths to return
+    
+    Returns:
+        list: Up to k paths (lists of rows), cheapest first; empty if target is unreachable
+    """
+    dist, pred = dijkstra(matrix, directed=True, indices=source, return_predecessors=True)
+    if np.isinf(dist[target]):
+        return []
+
+    shortest = [path_from_predecessors(pred, source, target)]
+    candidates = []
+    seen = {tuple(shortest[0])}
+    while len(shortest) < k:
+        for j in range(len(shortest[-1]) - 1):
+            path = spur_path(matrix, shortest, j, target)
+            if path is not None and tuple(path) not in seen:
+                seen.add(tuple(path))
+                heapq.heappush(candidates, (path_cost(matrix, path), path))
+
+        if not candidates:
+            break
+        shortest.append(heapq.heappop(candidates)[1])
+
+    return shortest
@@ -43,17 +43,8 @@ def split_file(input_file, output_dir, chunk_size_mb=24):
             print(f"Creating chunk {chunk_num + 1}/{num_chunks}: {chunk_filename}")
             
             with open(chunk_path, 'wb') as outfile:
-                bytes_written = 0
-                while bytes_written < chunk_size_bytes:
-                    # Read in smaller blocks to avoid memory issues
-                    block_size = min(8192, chunk_size_bytes - bytes_written)
-                    block = infile.read(block_size)
-                    
-                    if not block:  # End of file
-                        break
-                        
-                    outfile.write(block)
-                    bytes_written += len(block)
+                # One read per chunk; a chunk is at most chunk_size_mb in memory
+                outfile.write(infile.read(chunk_size_bytes))
             
             chunk_size_actual = os.path.getsize(chunk_path)
             print(f"  Chunk size: {chunk_size_actual / (1024*1024):.2f} MB")
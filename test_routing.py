@@ -0,0 +1,102 @@
+import networkx as nx
+import numpy as np
+import pytest
+from itertools import islice
+from scipy.sparse import csr_matrix
+
+from routing import path_cost, yen_k_shortest_paths
+
+
+def to_csr(graph):
+    """CSR matrix of travel_time plus the node order, as routing_matrix builds it."""
+    nodes = list(graph.nodes)
+    idx = {n: i for i, n in enumerate(nodes)}
+    rows = [idx[u] for u, _ in graph.edges]
+    cols = [idx[v] for _, v in graph.edges]
+    weights = [d['travel_time'] for _, _, d in graph.edges(data=True)]
+    matrix = csr_matrix((np.array(weights, dtype=float), (rows, cols)), shape=(len(nodes), len(nodes)))
+    matrix.sort_indices()
+    return matrix, nodes, idx
+
+
+def yen(graph, source, target, k):
+    matrix, nodes, idx = to_csr(graph)
+    paths = yen_k_shortest_paths(matrix, idx[source], idx[target], k)
+    return [[nodes[i] for i in path] for path in paths]
+
+
+def reference(graph, source, target, k):
+    try:
+        return list(islice(nx.shortest_simple_paths(graph, source, target, weight='travel_time'), k))
+    except nx.NetworkXNoPath:
+        return []
+
+
+def costs(graph, paths):
+    return [nx.path_weight(graph, path, 'travel_time') for path in paths]
+
+
+def grid_graph():
+    """Directed 4x4 grid in both directions with distinct pseudo-random travel times."""
+    rng = np.random.default_rng(0)
+    graph = nx.DiGraph()
+    for u, v in nx.grid_2d_graph(4, 4).edges:
+        graph.add_edge(u, v, travel_time=float(rng.uniform(10, 100)))
+        graph.add_edge(v, u, travel_time=float(rng.uniform(10, 100)))
+    return nx.convert_node_labels_to_integers(graph)
+
+
+def assert_valid(graph, paths, source, target):
+    for path in paths:
+        assert path[0] == source and path[-1] == target
+        assert len(set(path)) == len(path)  # loopless
+        assert all(graph.has_edge(u, v) for u, v in zip(path[:-1], path[1:]))
+    assert len({tuple(path) for path in paths}) == len(paths)
+
+
+@pytest.mark.parametrize("source,target", [(0, 15), (5, 10), (12, 3)])
+def test_matches_networkx(source, target):
+    graph = grid_graph()
+    paths = yen(graph, source, target, 8)
+    expected = reference(graph, source, target, 8)
+    assert_valid(graph, paths, source, target)
+    assert costs(graph, paths) == pytest.approx(costs(graph, expected))
+
+
+def test_ties_return_every_equal_cost_path():
+    graph = nx.DiGraph()
+    for mid in ("a", "b", "c"):
+        graph.add_edge("s", mid, travel_time=1.0)
+        graph.add_edge(mid, "t", travel_time=1.0)
+    graph.add_edge("s", "t", travel_time=5.0)
+    paths = yen(graph, "s", "t", 3)
+    assert_valid(graph, paths, "s", "t")
+    assert sorted(paths) == [["s", "a", "t"], ["s", "b", "t"], ["s", "c", "t"]]
+    assert yen(graph, "s", "t", 4)[-1] == ["s", "t"]
+
+
+def test_fewer_than_k_paths():
+    graph = nx.DiGraph()
+    graph.add_edge(0, 1, travel_time=1.0)
+    graph.add_edge(1, 2, travel_time=1.0)
+    graph.add_edge(0, 2, travel_time=3.0)
+    assert yen(graph, 0, 2, 5) == reference(graph, 0, 2, 5) == [[0, 1, 2], [0, 2]]
+
+
+def test_no_path():
+    graph = nx.DiGraph()
+    graph.add_edge(0, 1, travel_time=1.0)
+    graph.add_edge(2, 1, travel_time=1.0)
+    assert yen(graph, 0, 2, 5) == reference(graph, 0, 2, 5) == []
+
+
+def test_source_equals_target():
+    graph = grid_graph()
+    assert yen(graph, 6, 6, 5) == reference(graph, 6, 6, 5) == [[6]]
+
+
+def test_path_cost_uses_matrix_weights():
+    graph = grid_graph()
+    matrix, nodes, idx = to_csr(graph)
+    path = yen_k_shortest_paths(matrix, idx[0], idx[15], 1)[0]
+    assert path_cost(matrix, path) == pytest.approx(nx.path_weight(graph, [nodes[i] for i in path], 'travel_time'))